@@ -0,0 +1,244 @@
+"""
+Headless JSON metrics API
+Serves the dashboard's read queries from one shared SentimentAnalysisPlatform so
+many viewers cost one computation per distinct query instead of one per session.
+
+Usage: python api_server.py --port 8080 --db-path sentiment_data.db
+Dashboard: SENTIMENT_API_URL=http://127.0.0.1:8080 streamlit run app.py
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import time
+from dataclasses import asdict
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from aiohttp import web
+
+from sentiment_platform import SentimentAnalysisPlatform
+
+MAX_HOURS = 24 * 365
+MAX_RECENT = 100
+
+
+def _json_default(value):
+    """Encode the NumPy scalars and datetimes the platform methods return"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _to_jsonable(result):
+    """Tables go out column-oriented ({"columns": [...], "data": [[...]]}) to keep bodies small"""
+    if isinstance(result, pd.DataFrame):
+        return {'columns': result.columns.tolist(), 'data': result.to_numpy().tolist()}
+    if isinstance(result, list):
+        return [asdict(item) if hasattr(item, '__dataclass_fields__') else item for item in result]
+    return result
+
+
+def _dumps(payload) -> bytes:
+    return json.dumps(payload, default=_json_default, separators=(',', ':')).encode('utf-8')
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match check: a comma-separated list of tags or '*', compared weakly"""
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or etag in (tag[2:] if tag.startswith('W/') else tag for tag in tags)
+
+
+class CachedResponse:
+    """A serialized result: JSON body and its gzip form, each with its own strong ETag.
+
+    Keys in etag_exclude (on list items) are left out of the ETag hash, so fields
+    stamped per computation, like an alert's check time, don't defeat 304s.
+    """
+    __slots__ = ('body', 'gzip_body', 'etag', 'gzip_etag', 'created')
+
+    def __init__(self, result, etag_exclude: Tuple[str, ...] = ()):
+        payload = _to_jsonable(result)
+        self.body = _dumps(payload)
+        self.gzip_body = gzip.compress(self.body, compresslevel=6)
+
+        hashed = self.body
+        if etag_exclude and isinstance(payload, list):
+            hashed = _dumps([{k: v for k, v in item.items() if k not in etag_exclude} for item in payload])
+        digest = hashlib.blake2b(hashed, digest_size=12).hexdigest()
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gz"'
+        self.created = time.monotonic()
+
+
+class MetricsServer:
+    """Coalesces identical in-flight queries and briefly caches their serialized responses"""
+
+    def __init__(self, platform: SentimentAnalysisPlatform, cache_ttl: float = 1.0):
+        self.platform = platform
+        self.cache_ttl = cache_ttl
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self._cache: Dict[Tuple, CachedResponse] = {}
+        self.stats = {'requests': 0, 'computations': 0, 'coalesced': 0, 'cache_hits': 0, 'not_modified': 0}
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.add_routes([
+            web.get('/health', self.health),
+            web.get('/api/summary', self.summary),
+            web.get('/api/distribution', self.distribution),
+            web.get('/api/trend', self.trend),
+            web.get('/api/platforms', self.platforms),
+            web.get('/api/alerts', self.alerts),
+            web.get('/api/comparison', self.comparison),
+            web.get('/api/brands', self.brands),
+            web.get('/api/recent', self.recent),
+        ])
+        return app
+
+    async def _result(self, key: Tuple, compute: Callable, *args,
+                      etag_exclude: Tuple[str, ...] = ()) -> CachedResponse:
+        cached = self._cache.get(key)
+        if cached and time.monotonic() - cached.created < self.cache_ttl:
+            self.stats['cache_hits'] += 1
+            return cached
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._compute(key, compute, *args, etag_exclude=etag_exclude))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.stats['coalesced'] += 1
+        # Shield so one client disconnecting does not cancel the query others are waiting on
+        return await asyncio.shield(future)
+
+    async def _compute(self, key: Tuple, compute: Callable, *args,
+                       etag_exclude: Tuple[str, ...] = ()) -> CachedResponse:
+        self.stats['computations'] += 1
+        loop = asyncio.get_running_loop()
+        # SQLite and pandas block, so run the query and serialization off the event loop
+        response = await loop.run_in_executor(None, lambda: CachedResponse(compute(*args), etag_exclude))
+        if self.cache_ttl > 0:
+            # Keys come from client input, so drop expired entries before adding another
+            now = time.monotonic()
+            for stale in [k for k, cached in self._cache.items() if now - cached.created >= self.cache_ttl]:
+                del self._cache[stale]
+            self._cache[key] = response
+        return response
+
+    async def _respond(self, request: web.Request, compute: Callable, *args,
+                       etag_exclude: Tuple[str, ...] = ()) -> web.Response:
+        self.stats['requests'] += 1
+        cached = await self._result((request.path,) + args, compute, *args, etag_exclude=etag_exclude)
+
+        headers = {'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+        if 'gzip' in request.headers.get('Accept-Encoding', '') and len(cached.gzip_body) < len(cached.body):
+            body, headers['ETag'] = cached.gzip_body, cached.gzip_etag
+            headers['Content-Encoding'] = 'gzip'
+        else:
+            body, headers['ETag'] = cached.body, cached.etag
+
+        if _etag_matches(request.headers.get('If-None-Match', ''), headers['ETag']):
+            self.stats['not_modified'] += 1
+            headers.pop('Content-Encoding', None)
+            return web.Response(status=304, headers=headers)
+
+        return web.Response(body=body, content_type='application/json', headers=headers)
+
+    @staticmethod
+    def _brand(request: web.Request) -> str:
+        brand = request.query.get('brand', '').strip()
+        if not brand:
+            raise web.HTTPBadRequest(text="missing 'brand' query parameter")
+        return brand
+
+    @staticmethod
+    def _hours(request: web.Request, default: int) -> int:
+        try:
+            hours = int(request.query.get('hours', default))
+        except ValueError:
+            raise web.HTTPBadRequest(text="'hours' must be an integer")
+        if not 1 <= hours <= MAX_HOURS:
+            raise web.HTTPBadRequest(text=f"'hours' must be between 1 and {MAX_HOURS}")
+        return hours
+
+    @staticmethod
+    def _limit(request: web.Request, default: int) -> int:
+        try:
+            limit = int(request.query.get('limit', default))
+        except ValueError:
+            raise web.HTTPBadRequest(text="'limit' must be an integer")
+        if not 1 <= limit <= MAX_RECENT:
+            raise web.HTTPBadRequest(text=f"'limit' must be between 1 and {MAX_RECENT}")
+        return limit
+
+    @staticmethod
+    def _datetime(request: web.Request, name: str) -> Optional[datetime]:
+        value = request.query.get(name)
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            raise web.HTTPBadRequest(text=f"'{name}' must be an ISO 8601 datetime")
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({'status': 'ok', **self.stats})
+
+    async def summary(self, request: web.Request) -> web.Response:
+        return await self._respond(request, self.platform.get_sentiment_summary,
+                                   self._brand(request), self._hours(request, 24))
+
+    async def distribution(self, request: web.Request) -> web.Response:
+        start, end = self._datetime(request, 'start'), self._datetime(request, 'end')
+        if start and end and end <= start:
+            raise web.HTTPBadRequest(text="'end' must be after 'start'")
+        return await self._respond(request, self.platform.get_distribution_summary,
+                                   self._brand(request), self._hours(request, 168), start, end)
+
+    async def trend(self, request: web.Request) -> web.Response:
+        return await self._respond(request, self.platform.get_sentiment_trend,
+                                   self._brand(request), self._hours(request, 24))
+
+    async def platforms(self, request: web.Request) -> web.Response:
+        return await self._respond(request, self.platform.get_platform_breakdown,
+                                   self._brand(request), self._hours(request, 24))
+
+    async def alerts(self, request: web.Request) -> web.Response:
+        # Alert timestamps are the time of the check, not of the data
+        return await self._respond(request, self.platform.check_alerts, self._brand(request),
+                                   etag_exclude=('timestamp',))
+
+    async def comparison(self, request: web.Request) -> web.Response:
+        return await self._respond(request, self.platform.get_competitor_comparison, self._hours(request, 24))
+
+    async def brands(self, request: web.Request) -> web.Response:
+        return await self._respond(request, self.platform.get_tracked_brands)
+
+    async def recent(self, request: web.Request) -> web.Response:
+        return await self._respond(request, self.platform.get_recent_mentions,
+                                   self._brand(request), self._limit(request, 10))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentiment metrics JSON API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--db-path', default='sentiment_data.db')
+    parser.add_argument('--cache-ttl', type=float, default=1.0,
+                        help="seconds a computed response is reused (0 = coalescing only)")
+    args = parser.parse_args()
+
+    server = MetricsServer(SentimentAnalysisPlatform(db_path=args.db_path), cache_ttl=args.cache_ttl)
+    web.run_app(server.create_app(), host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
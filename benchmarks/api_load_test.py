@@ -0,0 +1,156 @@
+"""
+Load test for api_server.py: requests/second and latency percentiles at rising concurrency
+
+Usage:
+    python benchmarks/api_load_test.py                      # starts a local server on a seeded temp DB
+    python benchmarks/api_load_test.py --url http://127.0.0.1:8080 --concurrency 1 50 500
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from itertools import cycle
+from typing import Tuple
+
+import aiohttp
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sentiment_platform import SentimentAnalysisPlatform  # noqa: E402
+
+BRANDS = ["Apple", "Google", "Tesla", "Amazon", "Microsoft"]
+
+
+def endpoints(brand: str):
+    """What one dashboard page load asks for"""
+    return [
+        f"/api/summary?brand={brand}&hours=24",
+        f"/api/distribution?brand={brand}&hours=24",
+        f"/api/trend?brand={brand}&hours=24",
+        f"/api/platforms?brand={brand}&hours=24",
+        f"/api/alerts?brand={brand}",
+        "/api/comparison?hours=24",
+        "/api/brands",
+        f"/api/recent?brand={brand}&limit=10",
+    ]
+
+
+def seed_database(db_path: str, mentions_per_brand: int):
+    platform = SentimentAnalysisPlatform(db_path=db_path)
+    for brand in BRANDS:
+        platform.add_brand_tracking(brand)
+        platform.store_mentions(brand, platform.collect_mentions(brand, count=mentions_per_brand))
+
+
+def start_server(db_path: str, cache_ttl: float) -> Tuple[subprocess.Popen, str]:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'api_server.py'), '--port', str(port),
+         '--db-path', db_path, '--cache-ttl', str(cache_ttl)]
+    )
+    return process, f"http://127.0.0.1:{port}"
+
+
+async def wait_until_ready(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(f"{url}/health") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not become ready")
+
+
+async def run_level(url: str, concurrency: int, duration: float, use_etags: bool):
+    """Each client loops over a dashboard's endpoints for `duration` seconds"""
+    latencies, errors = [], 0
+    deadline = time.monotonic() + duration
+    connector = aiohttp.TCPConnector(limit=0)
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async def client(index: int):
+            nonlocal errors
+            paths = cycle(endpoints(BRANDS[index % len(BRANDS)]))
+            etags = {}
+            while time.monotonic() < deadline:
+                path = next(paths)
+                headers = {'Accept-Encoding': 'gzip'}
+                if use_etags and path in etags:
+                    headers['If-None-Match'] = etags[path]
+                started = time.perf_counter()
+                try:
+                    async with session.get(url + path, headers=headers) as response:
+                        await response.read()
+                        if response.status == 200:
+                            etags[path] = response.headers.get('ETag')
+                        elif response.status != 304:
+                            errors += 1
+                except aiohttp.ClientError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.monotonic()
+        await asyncio.gather(*(client(i) for i in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    latencies = np.array(latencies) * 1000
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50': float(np.percentile(latencies, 50)) if len(latencies) else float('nan'),
+        'p99': float(np.percentile(latencies, 99)) if len(latencies) else float('nan'),
+        'errors': errors,
+    }
+
+
+async def run(url: str, levels, duration: float, use_etags: bool):
+    await wait_until_ready(url)
+    print(f"{'clients':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for concurrency in levels:
+        result = await run_level(url, concurrency, duration, use_etags)
+        print(f"{concurrency:>8}{result['rps']:>10.0f}{result['p50']:>10.1f}{result['p99']:>10.1f}{result['errors']:>8}")
+
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"{url}/health") as response:
+            print("server stats:", await response.json())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Metrics API load test")
+    parser.add_argument('--url', help="existing server; omit to start one on a seeded temp database")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50, 100, 250, 500])
+    parser.add_argument('--duration', type=float, default=5.0, help="seconds per concurrency level")
+    parser.add_argument('--cache-ttl', type=float, default=1.0, help="for the locally started server")
+    parser.add_argument('--mentions', type=int, default=20000, help="seeded mentions per brand")
+    parser.add_argument('--no-etags', action='store_true', help="always fetch full bodies")
+    args = parser.parse_args()
+
+    if args.url:
+        asyncio.run(run(args.url, args.concurrency, args.duration, not args.no_etags))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "load_test.db")
+        seed_database(db_path, args.mentions)
+        process, url = start_server(db_path, args.cache_ttl)
+        try:
+            asyncio.run(run(url, args.concurrency, args.duration, not args.no_etags))
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
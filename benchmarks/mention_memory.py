@@ -0,0 +1,55 @@
+"""
+Memory-per-mention benchmark: legacy list of dicts vs columnar MentionBatch
+
+Usage: python benchmarks/mention_memory.py [count]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentiment_platform import PLATFORMS, MockDataCollector  # noqa: E402
+
+
+def measure(build):
+    """Return (result, bytes retained, seconds) for a zero-argument builder"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained, elapsed
+
+
+def main(count: int = 100_000):
+    collector = MockDataCollector()
+    platform_codes = np.random.choice(len(PLATFORMS), size=count, p=[0.6, 0.2, 0.2]).astype(np.int8)
+
+    # Build each representation from scratch so neither shares string objects with the other
+    batch, batch_bytes, batch_seconds = measure(
+        lambda: collector.generate_mock_batch("Apple", platform_codes)
+    )
+    records, records_bytes, records_seconds = measure(
+        lambda: collector.generate_mock_batch("Apple", platform_codes).to_records()
+    )
+    _, frame_bytes, frame_seconds = measure(batch.to_dataframe)
+
+    print(f"{count:,} mentions")
+    print(f"{'representation':<18}{'bytes/mention':>15}{'total MB':>12}{'build s':>10}")
+    for name, retained, seconds in [
+        ("List[Dict]", records_bytes, records_seconds),
+        ("MentionBatch", batch_bytes, batch_seconds),
+        ("to_dataframe()", frame_bytes, frame_seconds),
+    ]:
+        print(f"{name:<18}{retained / count:>15.1f}{retained / 1e6:>12.1f}{seconds:>10.3f}")
+    print(f"List[Dict] uses {records_bytes / batch_bytes:.1f}x the memory of MentionBatch")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
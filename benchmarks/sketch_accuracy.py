@@ -0,0 +1,91 @@
+"""
+Sketch accuracy and speed: hourly HyperLogLog/KLL sketches vs exact SQL over raw mentions
+
+Usage: python benchmarks/sketch_accuracy.py [mentions]
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentiment_platform import SentimentAnalysisPlatform  # noqa: E402
+
+BRAND = "Apple"
+DAY_US = 86_400_000_000
+# Exit non-zero when the sketches drift past these (same bounds as tests/test_sketches.py)
+AUTHOR_ERROR = 0.05
+RANK_ERROR = 0.02
+
+
+def populate(platform: SentimentAnalysisPlatform, count: int, days: int = 30, batch_size: int = 20_000):
+    """Spread mock mentions over the last `days` days with a large author population"""
+    for start in range(0, count, batch_size):
+        batch = platform.collect_mentions(BRAND, count=min(batch_size, count - start))
+        batch.timestamp -= np.random.randint(0, days, len(batch)) * DAY_US
+        batch.author = np.array([f"user_{i}" for i in np.random.randint(0, count, len(batch))], dtype=object)
+        platform.store_mentions(BRAND, batch)
+
+
+def exact(db_path: str, hours: int):
+    """COUNT(DISTINCT author) and percentiles over raw rows, on the same whole-hour window"""
+    cutoff = np.datetime_as_string(np.datetime64(datetime.now() - timedelta(hours=hours), 'h'), unit='s')
+    conn = sqlite3.connect(db_path)
+    unique_authors = conn.execute(
+        'SELECT COUNT(DISTINCT author) FROM mentions WHERE brand = ? AND timestamp >= ?', (BRAND, cutoff)
+    ).fetchone()[0]
+    scores = np.array([row[0] for row in conn.execute(
+        'SELECT sentiment_score FROM mentions WHERE brand = ? AND timestamp >= ?', (BRAND, cutoff)
+    )])
+    conn.close()
+    p10, median, p90 = np.percentile(scores, [10, 50, 90])
+    return {'unique_authors': unique_authors, 'sentiment_p10': p10,
+            'sentiment_median': median, 'sentiment_p90': p90, 'scores': np.sort(scores)}
+
+
+def main(count: int = 200_000) -> int:
+    np.random.seed(0)
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        platform = SentimentAnalysisPlatform(db_path=os.path.join(tmp, "bench.db"))
+        started = time.perf_counter()
+        populate(platform, count)
+        print(f"ingested {count:,} mentions with sketches in {time.perf_counter() - started:.1f}s")
+
+        for hours in (168, 720):
+            started = time.perf_counter()
+            truth = exact(platform.db_path, hours)
+            exact_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            approx = platform.get_distribution_summary(BRAND, hours)
+            sketch_seconds = time.perf_counter() - started
+
+            print(f"\nwindow {hours}h: exact {exact_seconds * 1000:.1f} ms, "
+                  f"sketches {sketch_seconds * 1000:.1f} ms ({exact_seconds / sketch_seconds:.1f}x)")
+            error = abs(approx['unique_authors'] - truth['unique_authors']) / truth['unique_authors']
+            print(f"  unique authors   exact {truth['unique_authors']:>9,}  "
+                  f"sketch {approx['unique_authors']:>9,}  error {error:.2%}")
+            failures += error >= AUTHOR_ERROR
+            for key, q in (('sentiment_p10', 0.1), ('sentiment_median', 0.5), ('sentiment_p90', 0.9)):
+                # Quantile error is reported in rank space, the quantity KLL bounds
+                low = np.searchsorted(truth['scores'], approx[key], side='left')
+                high = np.searchsorted(truth['scores'], approx[key], side='right')
+                rank_error = max(0.0, low / len(truth['scores']) - q, q - high / len(truth['scores']))
+                print(f"  {key:<16} exact {truth[key]:>9.3f}  sketch {approx[key]:>9.3f}  "
+                      f"rank error {rank_error:.2%}")
+                failures += rank_error >= RANK_ERROR
+
+    if failures:
+        print(f"\nFAILED: {failures} estimate(s) outside the error bounds")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000))
@@ -0,0 +1,835 @@
+"""
+Sentiment analysis platform core: mock collection and scoring, columnar mention
+batches, SQLite storage and queries, and a client for the metrics API.
+Has no UI imports, so the dashboard (app.py) and the headless API server share it.
+"""
+
+import pandas as pd
+import numpy as np
+import sqlite3
+from datetime import datetime, timedelta
+import json
+import gzip
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Sequence, Tuple, Iterator
+
+from sketches import HyperLogLog, KLLSketch
+
+# Category vocabularies for the columnar mention batch (codes index into these)
+PLATFORMS = ('twitter', 'news', 'reddit')
+SENTIMENT_LABELS = ('positive', 'negative', 'neutral')
+LOCATIONS = ('US', 'UK', 'CA', 'AU', 'DE', 'FR', 'JP')
+
+# Mock APIs for demo (replace with real APIs in production)
+class MockSentimentAnalyzer:
+    def __init__(self):
+        self.sentiment_words = {
+            'positive': ['great', 'excellent', 'amazing', 'love', 'fantastic', 'wonderful', 'awesome', 'good', 'happy', 'satisfied'],
+            'negative': ['terrible', 'awful', 'hate', 'bad', 'horrible', 'disappointing', 'worst', 'annoying', 'frustrated', 'angry'],
+            'neutral': ['okay', 'fine', 'average', 'normal', 'standard', 'regular', 'typical']
+        }
+    
+    def analyze_sentiment(self, text: str) -> Dict:
+        """Simple rule-based sentiment analysis for demo"""
+        text_lower = text.lower()
+        
+        positive_score = sum(1 for word in self.sentiment_words['positive'] if word in text_lower)
+        negative_score = sum(1 for word in self.sentiment_words['negative'] if word in text_lower)
+        neutral_score = sum(1 for word in self.sentiment_words['neutral'] if word in text_lower)
+        
+        total_score = positive_score + negative_score + neutral_score
+        
+        if total_score == 0:
+            return {'compound': 0.0, 'sentiment': 'neutral', 'confidence': 0.5}
+        
+        # Calculate compound score (-1 to 1)
+        compound = (positive_score - negative_score) / max(total_score, 1)
+        compound += np.random.normal(0, 0.1)  # Add some noise for realism
+        compound = max(-1, min(1, compound))  # Clamp to [-1, 1]
+        
+        # Determine sentiment label
+        if compound >= 0.05:
+            sentiment = 'positive'
+        elif compound <= -0.05:
+            sentiment = 'negative'
+        else:
+            sentiment = 'neutral'
+        
+        confidence = min(0.95, 0.6 + abs(compound))
+        
+        return {
+            'compound': compound,
+            'sentiment': sentiment,
+            'confidence': confidence
+        }
+    
+    def analyze_batch(self, texts: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Score many texts at once; same rules as analyze_sentiment, columnar output"""
+        n = len(texts)
+        vocabularies = [self.sentiment_words[label] for label in SENTIMENT_LABELS]
+        
+        counts = np.zeros((n, len(vocabularies)), dtype=np.int32)
+        for i, text in enumerate(texts):
+            text_lower = text.lower()
+            for j, words in enumerate(vocabularies):
+                counts[i, j] = sum(1 for word in words if word in text_lower)
+        
+        total = counts.sum(axis=1)
+        scored = total > 0
+        
+        # Texts without any sentiment words stay at 0.0 / neutral / 0.5 confidence
+        compound = np.zeros(n)
+        compound[scored] = (counts[scored, 0] - counts[scored, 1]) / total[scored]
+        compound[scored] += np.random.normal(0, 0.1, int(scored.sum()))
+        np.clip(compound, -1, 1, out=compound)
+        
+        label_codes = np.full(n, SENTIMENT_LABELS.index('neutral'), dtype=np.int8)
+        label_codes[compound >= 0.05] = SENTIMENT_LABELS.index('positive')
+        label_codes[compound <= -0.05] = SENTIMENT_LABELS.index('negative')
+        
+        confidence = np.minimum(0.95, 0.6 + np.abs(compound))
+        confidence[~scored] = 0.5
+        
+        return {
+            'compound': compound,
+            'label_codes': label_codes,
+            'confidence': confidence
+        }
+
+def _encode_categorical(values: Sequence, categories: Sequence[str]) -> Tuple[np.ndarray, Tuple[str, ...]]:
+    """Map values to integer codes, extending the categories with unseen values (None -> -1)"""
+    lookup = {category: code for code, category in enumerate(categories)}
+    codes = []
+    for value in values:
+        if value is None:
+            codes.append(-1)
+            continue
+        value = str(value)
+        if value not in lookup:
+            lookup[value] = len(lookup)
+        codes.append(lookup[value])
+    dtype = np.int8 if len(lookup) <= np.iinfo(np.int8).max else np.int16
+    return np.asarray(codes, dtype=dtype), tuple(lookup)
+
+def _decode_categorical(codes: np.ndarray, categories: Tuple[str, ...]) -> np.ndarray:
+    """Inverse of _encode_categorical; code -1 decodes to None"""
+    return np.array(categories + (None,), dtype=object)[codes]
+
+@dataclass
+class MentionBatch:
+    """Columnar batch of mentions: one NumPy array per field instead of one dict per mention.
+    
+    Platform, sentiment label and location are stored as small integer codes into the
+    ``platforms``/``labels``/``locations`` tuples, and timestamps as int64 microseconds
+    since the epoch (naive wall-clock time, like ``datetime.now()``).
+    """
+    content: np.ndarray          # object (str)
+    author: np.ndarray           # object (str)
+    timestamp: np.ndarray        # int64 epoch microseconds
+    sentiment_score: np.ndarray  # float64
+    confidence: np.ndarray       # float64
+    engagement: np.ndarray       # int32
+    reach: np.ndarray            # int32
+    platform_codes: np.ndarray   # int8 codes into platforms
+    label_codes: np.ndarray      # int8 codes into labels
+    location_codes: np.ndarray   # int8 codes into locations
+    platforms: Tuple[str, ...] = PLATFORMS
+    labels: Tuple[str, ...] = SENTIMENT_LABELS
+    locations: Tuple[str, ...] = LOCATIONS
+    
+    def __len__(self) -> int:
+        return len(self.timestamp)
+    
+    @classmethod
+    def from_records(cls, records: Sequence[Dict]) -> 'MentionBatch':
+        """Build a batch from the legacy list-of-dicts mention format"""
+        platform_codes, platforms = _encode_categorical([r['platform'] for r in records], PLATFORMS)
+        label_codes, labels = _encode_categorical([r['sentiment_label'] for r in records], SENTIMENT_LABELS)
+        location_codes, locations = _encode_categorical([r.get('location') for r in records], LOCATIONS)
+        
+        return cls(
+            content=np.array([r['content'] for r in records], dtype=object),
+            author=np.array([r.get('author') for r in records], dtype=object),
+            timestamp=np.array([r['timestamp'] for r in records], dtype='datetime64[us]').view(np.int64),
+            sentiment_score=np.array([r['sentiment_score'] for r in records], dtype=np.float64),
+            confidence=np.array([r.get('confidence', np.nan) for r in records], dtype=np.float64),
+            engagement=np.array([r.get('engagement', 0) for r in records], dtype=np.int32),
+            reach=np.array([r.get('reach', 0) for r in records], dtype=np.int32),
+            platform_codes=platform_codes,
+            label_codes=label_codes,
+            location_codes=location_codes,
+            platforms=platforms,
+            labels=labels,
+            locations=locations
+        )
+    
+    def to_records(self) -> List[Dict]:
+        """Expand back into the legacy list-of-dicts format"""
+        columns = {
+            'content': self.content.tolist(),
+            'platform': _decode_categorical(self.platform_codes, self.platforms).tolist(),
+            'author': self.author.tolist(),
+            'timestamp': self.timestamp.view('datetime64[us]').astype(object).tolist(),
+            'sentiment_score': self.sentiment_score.tolist(),
+            'sentiment_label': _decode_categorical(self.label_codes, self.labels).tolist(),
+            'confidence': self.confidence.tolist(),
+            'engagement': self.engagement.tolist(),
+            'reach': self.reach.tolist(),
+            'location': _decode_categorical(self.location_codes, self.locations).tolist()
+        }
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
+    
+    def to_dataframe(self) -> pd.DataFrame:
+        """View the batch as a DataFrame without copying the underlying arrays"""
+        def categorical(codes, categories):
+            return pd.Categorical.from_codes(
+                codes, dtype=pd.CategoricalDtype(list(categories)), validate=False
+            )
+        
+        return pd.DataFrame({
+            'content': self.content,
+            'platform': categorical(self.platform_codes, self.platforms),
+            'author': self.author,
+            'timestamp': self.timestamp.view('datetime64[us]'),
+            'sentiment_score': self.sentiment_score,
+            'sentiment_label': categorical(self.label_codes, self.labels),
+            'confidence': self.confidence,
+            'engagement': self.engagement,
+            'reach': self.reach,
+            'location': categorical(self.location_codes, self.locations)
+        }, copy=False)
+    
+    def iter_db_rows(self, brand: str, chunk_size: int = 10000) -> Iterator[tuple]:
+        """Yield mentions-table rows, materialising Python objects one chunk at a time"""
+        for start in range(0, len(self), chunk_size):
+            chunk = slice(start, start + chunk_size)
+            timestamps = np.datetime_as_string(self.timestamp[chunk].view('datetime64[us]'), unit='us')
+            yield from zip(
+                [brand] * len(timestamps),
+                self.content[chunk].tolist(),
+                _decode_categorical(self.platform_codes[chunk], self.platforms).tolist(),
+                self.author[chunk].tolist(),
+                timestamps.tolist(),
+                self.sentiment_score[chunk].tolist(),
+                _decode_categorical(self.label_codes[chunk], self.labels).tolist(),
+                self.confidence[chunk].tolist(),
+                self.engagement[chunk].tolist(),
+                self.reach[chunk].tolist(),
+                _decode_categorical(self.location_codes[chunk], self.locations).tolist()
+            )
+
+class MockDataCollector:
+    def __init__(self):
+        self.sentiment_analyzer = MockSentimentAnalyzer()
+        
+        # Mock content templates
+        self.tweet_templates = [
+            "Just tried {brand} and it's {sentiment_word}! #{brand}",
+            "{brand} customer service is {sentiment_word}. #CustomerService",
+            "Can't believe how {sentiment_word} {brand} products are!",
+            "{brand}'s new update is {sentiment_word}. What do you think?",
+            "My experience with {brand} was {sentiment_word}. Would {recommend}.",
+            "{brand} vs competitors? {brand} is {sentiment_word}!",
+            "Breaking: {brand} announces new features. This is {sentiment_word}!",
+            "Anyone else think {brand} is getting {sentiment_word} lately?",
+            "Daily reminder that {brand} is {sentiment_word} ✨",
+            "{brand} support team is {sentiment_word}. Thank you!"
+        ]
+        
+        self.news_templates = [
+            "{brand} reports {sentiment_word} quarterly earnings",
+            "Market analysts say {brand} performance is {sentiment_word}",
+            "{brand} stock outlook remains {sentiment_word} according to experts",
+            "Industry report: {brand}'s strategy is {sentiment_word}",
+            "{brand} launches new product line to {sentiment_word} reviews",
+            "Consumer confidence in {brand} is {sentiment_word}, survey shows",
+            "{brand} faces {sentiment_word} market conditions",
+            "Investors react {sentiment_word} to {brand}'s announcement",
+            "{brand}'s sustainability efforts receive {sentiment_word} feedback",
+            "Competition heats up as {brand} shows {sentiment_word} growth"
+        ]
+        
+        self.reddit_templates = [
+            "DAE think {brand} is {sentiment_word}?",
+            "PSA: {brand} is having a {sentiment_word} sale!",
+            "Unpopular opinion: {brand} is {sentiment_word}",
+            "LPT: {brand} products are {sentiment_word} for...",
+            "TIFU by not knowing how {sentiment_word} {brand} is",
+            "AMA request: Someone who thinks {brand} is {sentiment_word}",
+            "TIL that {brand} is {sentiment_word} because...",
+            "ELI5: Why is {brand} so {sentiment_word}?",
+            "CMV: {brand} is the most {sentiment_word} company",
+            "Discussion: Is {brand} really that {sentiment_word}?"
+        ]
+    
+    def generate_mock_mention(self, brand: str, platform: str = 'twitter') -> Dict:
+        """Generate a realistic mock mention for demo purposes"""
+        code = PLATFORMS.index(platform) if platform in PLATFORMS else PLATFORMS.index('twitter')
+        return self.generate_mock_batch(brand, np.array([code], dtype=np.int8)).to_records()[0]
+    
+    def generate_mock_batch(self, brand: str, platform_codes: np.ndarray) -> MentionBatch:
+        """Generate one mock mention per entry of platform_codes (indices into PLATFORMS)"""
+        n = len(platform_codes)
+        templates = {
+            'twitter': self.tweet_templates,
+            'news': self.news_templates,
+            'reddit': self.reddit_templates
+        }
+        platform_templates = [templates[platform] for platform in PLATFORMS]
+        
+        # Choose sentiment and corresponding words
+        sentiment_types = np.random.choice(len(SENTIMENT_LABELS), size=n, p=[0.4, 0.3, 0.3])
+        template_draws = np.random.random(n)
+        word_draws = np.random.random(n)
+        
+        recommend_words = {
+            'positive': 'definitely recommend it',
+            'negative': 'not recommend it', 
+            'neutral': 'maybe recommend it'
+        }
+        
+        content = np.empty(n, dtype=object)
+        for i in range(n):
+            choices = platform_templates[platform_codes[i]]
+            template = choices[int(template_draws[i] * len(choices))]
+            sentiment_type = SENTIMENT_LABELS[sentiment_types[i]]
+            words = self.sentiment_analyzer.sentiment_words[sentiment_type]
+            content[i] = template.format(
+                brand=brand,
+                sentiment_word=words[int(word_draws[i] * len(words))],
+                recommend=recommend_words[sentiment_type]
+            )
+        
+        # Analyze sentiment
+        sentiment_result = self.sentiment_analyzer.analyze_batch(content)
+        
+        # Generate realistic metadata
+        engagement = np.maximum(1, np.random.exponential(10, n).astype(np.int64)).astype(np.float64)
+        positive = sentiment_result['label_codes'] == SENTIMENT_LABELS.index('positive')
+        engagement[positive] *= np.random.uniform(1.5, 3.0, int(positive.sum()))  # Positive content gets more engagement
+        reach = engagement * np.random.uniform(3, 15, n)
+        
+        now = np.datetime64(datetime.now(), 'us').astype(np.int64)
+        minutes_ago = np.random.randint(0, 1440, n).astype(np.int64)
+        
+        return MentionBatch(
+            content=content,
+            author=np.array([f"user_{i}" for i in np.random.randint(1000, 9999, n)], dtype=object),
+            timestamp=now - minutes_ago * 60_000_000,
+            sentiment_score=sentiment_result['compound'],
+            confidence=sentiment_result['confidence'],
+            engagement=engagement.astype(np.int32),
+            reach=reach.astype(np.int32),
+            platform_codes=np.asarray(platform_codes, dtype=np.int8),
+            label_codes=sentiment_result['label_codes'],
+            location_codes=np.random.randint(0, len(LOCATIONS), n).astype(np.int8)
+        )
+
+@dataclass
+class SentimentAlert:
+    alert_type: str
+    severity: str
+    message: str
+    timestamp: datetime
+    brand: str
+    threshold_value: float
+    current_value: float
+
+class SentimentAnalysisPlatform:
+    def __init__(self, db_path="sentiment_data.db"):
+        self.db_path = db_path
+        self.data_collector = MockDataCollector()
+        self.init_database()
+        
+        # Alert thresholds
+        self.alert_thresholds = {
+            'sentiment_drop': -0.3,  # Alert if sentiment drops below -0.3
+            'volume_spike': 200,     # Alert if mention volume exceeds 200% of average
+            'negative_spike': 0.4    # Alert if negative sentiment exceeds 40%
+        }
+    
+    def init_database(self):
+        """Initialize database for storing sentiment data"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS mentions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                brand TEXT NOT NULL,
+                content TEXT NOT NULL,
+                platform TEXT NOT NULL,
+                author TEXT,
+                timestamp TEXT NOT NULL,
+                sentiment_score REAL NOT NULL,
+                sentiment_label TEXT NOT NULL,
+                confidence REAL,
+                engagement INTEGER DEFAULT 0,
+                reach INTEGER DEFAULT 0,
+                location TEXT
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sentiment_alerts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                brand TEXT NOT NULL,
+                alert_type TEXT NOT NULL,
+                severity TEXT NOT NULL,
+                message TEXT NOT NULL,
+                threshold_value REAL,
+                current_value REAL,
+                timestamp TEXT NOT NULL,
+                acknowledged BOOLEAN DEFAULT FALSE
+            )
+        ''')
+        
+        # Per brand/hour mergeable sketches: distinct authors and sentiment quantiles
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'mention_sketches'")
+        sketches_existed = cursor.fetchone() is not None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS mention_sketches (
+                brand TEXT NOT NULL,
+                hour TEXT NOT NULL,
+                mention_count INTEGER NOT NULL,
+                author_hll BLOB NOT NULL,
+                sentiment_kll BLOB NOT NULL,
+                PRIMARY KEY (brand, hour)
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS brand_tracking (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                brand_name TEXT NOT NULL UNIQUE,
+                tracking_keywords TEXT,
+                created_at TEXT NOT NULL,
+                is_active BOOLEAN DEFAULT TRUE
+            )
+        ''')
+        
+        conn.commit()
+        conn.close()
+        
+        # Databases written before the sketch table existed have mentions but no sketches
+        if not sketches_existed:
+            self.rebuild_all_sketches()
+    
+    def add_brand_tracking(self, brand_name: str, keywords: List[str] = None):
+        """Add a brand for sentiment tracking"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        keywords_json = json.dumps(keywords if keywords else [brand_name])
+        
+        cursor.execute('''
+            INSERT OR REPLACE INTO brand_tracking (brand_name, tracking_keywords, created_at, is_active)
+            VALUES (?, ?, ?, ?)
+        ''', (brand_name, keywords_json, datetime.now().isoformat(), True))
+        
+        conn.commit()
+        conn.close()
+    
+    def collect_mentions(self, brand: str, count: int = 50) -> MentionBatch:
+        """Collect mentions for a brand (mock data for demo)"""
+        platform_weights = [0.6, 0.2, 0.2]  # Twitter is more common
+        platform_codes = np.random.choice(len(PLATFORMS), size=count, p=platform_weights).astype(np.int8)
+        
+        return self.data_collector.generate_mock_batch(brand, platform_codes)
+    
+    def store_mentions(self, brand: str, mentions: MentionBatch):
+        """Store mentions in database (a list of mention dicts is also accepted)"""
+        if not isinstance(mentions, MentionBatch):
+            mentions = MentionBatch.from_records(mentions)
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.executemany('''
+            INSERT INTO mentions 
+            (brand, content, platform, author, timestamp, sentiment_score, 
+             sentiment_label, confidence, engagement, reach, location)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', mentions.iter_db_rows(brand))
+        self._update_sketches(cursor, brand, mentions.timestamp, mentions.author, mentions.sentiment_score)
+        
+        conn.commit()
+        conn.close()
+    
+    def _update_sketches(self, cursor, brand: str, timestamps: np.ndarray,
+                         authors: np.ndarray, scores: np.ndarray):
+        """Merge new mentions into the hourly sketches (timestamps in epoch microseconds)"""
+        hours = timestamps // 3_600_000_000
+        for hour in np.unique(hours):
+            in_hour = hours == hour
+            hour_key = np.datetime_as_string(np.datetime64(int(hour), 'h'), unit='s')
+            
+            cursor.execute(
+                'SELECT mention_count, author_hll, sentiment_kll FROM mention_sketches WHERE brand = ? AND hour = ?',
+                (brand, hour_key)
+            )
+            row = cursor.fetchone()
+            if row:
+                mention_count = row[0]
+                authors_hll = HyperLogLog.from_bytes(row[1])
+                sentiment_kll = KLLSketch.from_bytes(row[2])
+            else:
+                mention_count, authors_hll, sentiment_kll = 0, HyperLogLog(), KLLSketch()
+            
+            authors_hll.update(authors[in_hour].tolist())
+            sentiment_kll.update(scores[in_hour])
+            
+            cursor.execute('''
+                INSERT OR REPLACE INTO mention_sketches
+                (brand, hour, mention_count, author_hll, sentiment_kll)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (brand, hour_key, mention_count + int(in_hour.sum()),
+                  authors_hll.to_bytes(), sentiment_kll.to_bytes()))
+    
+    def rebuild_all_sketches(self) -> List[str]:
+        """Recompute the hourly sketches of every brand that has mentions; returns the brands"""
+        conn = sqlite3.connect(self.db_path)
+        brands = [row[0] for row in conn.execute('SELECT DISTINCT brand FROM mentions')]
+        conn.close()
+        
+        for brand in brands:
+            self.rebuild_sketches(brand)
+        return brands
+    
+    def rebuild_sketches(self, brand: str):
+        """Recompute a brand's hourly sketches from the raw mentions table"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        raw = pd.read_sql_query(
+            'SELECT author, timestamp, sentiment_score FROM mentions WHERE brand = ?',
+            conn, params=(brand,)
+        )
+        cursor.execute('DELETE FROM mention_sketches WHERE brand = ?', (brand,))
+        if len(raw) > 0:
+            timestamps = np.array(raw['timestamp'].tolist(), dtype='datetime64[us]').view(np.int64)
+            self._update_sketches(cursor, brand, timestamps,
+                                  raw['author'].to_numpy(dtype=object),
+                                  raw['sentiment_score'].to_numpy(dtype=np.float64))
+        
+        conn.commit()
+        conn.close()
+    
+    def get_sentiment_summary(self, brand: str, hours: int = 24) -> Dict:
+        """Get sentiment summary for the last N hours"""
+        conn = sqlite3.connect(self.db_path)
+        
+        query = '''
+            SELECT 
+                AVG(sentiment_score) as avg_sentiment,
+                COUNT(*) as total_mentions,
+                SUM(CASE WHEN sentiment_label = 'positive' THEN 1 ELSE 0 END) as positive_count,
+                SUM(CASE WHEN sentiment_label = 'negative' THEN 1 ELSE 0 END) as negative_count,
+                SUM(CASE WHEN sentiment_label = 'neutral' THEN 1 ELSE 0 END) as neutral_count,
+                AVG(engagement) as avg_engagement,
+                SUM(reach) as total_reach
+            FROM mentions 
+            WHERE brand = ? AND timestamp > datetime('now', '-{} hours')
+        '''.format(hours)
+        
+        result = pd.read_sql_query(query, conn, params=(brand,))
+        conn.close()
+        
+        if result.iloc[0]['total_mentions'] == 0:
+            return {
+                'avg_sentiment': 0.0,
+                'total_mentions': 0,
+                'positive_pct': 0,
+                'negative_pct': 0,
+                'neutral_pct': 0,
+                'avg_engagement': 0,
+                'total_reach': 0
+            }
+        
+        row = result.iloc[0]
+        total = row['total_mentions']
+        
+        return {
+            'avg_sentiment': row['avg_sentiment'] or 0,
+            'total_mentions': int(total),
+            'positive_pct': (row['positive_count'] / total) * 100,
+            'negative_pct': (row['negative_count'] / total) * 100, 
+            'neutral_pct': (row['neutral_count'] / total) * 100,
+            'avg_engagement': row['avg_engagement'] or 0,
+            'total_reach': int(row['total_reach'] or 0)
+        }
+    
+    def get_distribution_summary(self, brand: str, hours: int = 168,
+                                 start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict:
+        """Unique authors and sentiment percentiles from the hourly sketches.
+        
+        Covers the last N hours, or start..end when start is given (end defaults to now).
+        Sketches are kept per whole hour, so the window widens to every hour it touches;
+        window_start/window_end report the span actually merged. Percentiles are None
+        when the window has no mentions.
+        """
+        end = end or datetime.now()
+        start = start or end - timedelta(hours=hours)
+        window_start = np.datetime64(start, 'h')
+        # Round end up to the next hour boundary unless it already sits on one
+        window_end = (np.datetime64(end, 'us') + np.timedelta64(1, 'h') - np.timedelta64(1, 'us')).astype('datetime64[h]')
+        window_start_key = str(np.datetime_as_string(window_start, unit='s'))
+        window_end_key = str(np.datetime_as_string(window_end, unit='s'))
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            '''SELECT mention_count, author_hll, sentiment_kll FROM mention_sketches
+               WHERE brand = ? AND hour >= ? AND hour < ?''',
+            (brand, window_start_key, window_end_key)
+        )
+        rows = cursor.fetchall()
+        conn.close()
+        
+        total_mentions = 0
+        authors_hll, sentiment_kll = HyperLogLog(), KLLSketch()
+        for mention_count, author_blob, sentiment_blob in rows:
+            total_mentions += mention_count
+            authors_hll.merge(HyperLogLog.from_bytes(author_blob))
+            sentiment_kll.merge(KLLSketch.from_bytes(sentiment_blob))
+        
+        p10, median, p90 = sentiment_kll.quantiles([0.1, 0.5, 0.9])
+        
+        return {
+            'total_mentions': total_mentions,
+            'unique_authors': int(round(authors_hll.count())),
+            'sentiment_p10': p10,
+            'sentiment_median': median,
+            'sentiment_p90': p90,
+            'window_start': window_start_key,
+            'window_end': window_end_key
+        }
+    
+    def get_sentiment_trend(self, brand: str, hours: int = 24) -> pd.DataFrame:
+        """Hourly average sentiment and mention volume for the last N hours"""
+        conn = sqlite3.connect(self.db_path)
+        
+        query = '''
+            SELECT 
+                datetime(timestamp) as datetime,
+                AVG(sentiment_score) as avg_sentiment,
+                COUNT(*) as mention_count
+            FROM mentions 
+            WHERE brand = ? AND timestamp > datetime('now', '-{} hours')
+            GROUP BY datetime(timestamp, 'start of hour')
+            ORDER BY datetime
+        '''.format(hours)
+        
+        trend_data = pd.read_sql_query(query, conn, params=(brand,))
+        conn.close()
+        return trend_data
+    
+    def get_platform_breakdown(self, brand: str, hours: int = 24) -> pd.DataFrame:
+        """Mention count, average sentiment and engagement per platform"""
+        conn = sqlite3.connect(self.db_path)
+        
+        query = '''
+            SELECT 
+                platform,
+                AVG(sentiment_score) as avg_sentiment,
+                COUNT(*) as mention_count,
+                SUM(engagement) as total_engagement
+            FROM mentions 
+            WHERE brand = ? AND timestamp > datetime('now', '-{} hours')
+            GROUP BY platform
+        '''.format(hours)
+        
+        platform_data = pd.read_sql_query(query, conn, params=(brand,))
+        conn.close()
+        return platform_data
+    
+    def get_recent_mentions(self, brand: str, limit: int = 10) -> pd.DataFrame:
+        """Most recent mentions for a brand, newest first"""
+        conn = sqlite3.connect(self.db_path)
+        
+        query = '''
+            SELECT content, platform, sentiment_label, sentiment_score, 
+                   engagement, timestamp
+            FROM mentions 
+            WHERE brand = ? 
+            ORDER BY timestamp DESC 
+            LIMIT ?
+        '''
+        
+        recent = pd.read_sql_query(query, conn, params=(brand, limit))
+        conn.close()
+        return recent
+    
+    def get_tracked_brands(self) -> List[str]:
+        """Names of all actively tracked brands"""
+        conn = sqlite3.connect(self.db_path)
+        brands_df = pd.read_sql_query("SELECT brand_name FROM brand_tracking WHERE is_active = 1", conn)
+        conn.close()
+        return brands_df['brand_name'].tolist()
+    
+    def get_competitor_comparison(self, hours: int = 24) -> List[Dict]:
+        """Sentiment summary for every tracked brand"""
+        comparison_data = []
+        for brand in self.get_tracked_brands():
+            summary = self.get_sentiment_summary(brand, hours=hours)
+            comparison_data.append({
+                'brand': brand,
+                'avg_sentiment': summary['avg_sentiment'],
+                'total_mentions': summary['total_mentions'],
+                'positive_pct': summary['positive_pct'],
+                'negative_pct': summary['negative_pct']
+            })
+        return comparison_data
+    
+    def check_alerts(self, brand: str) -> List[SentimentAlert]:
+        """Check for sentiment alerts"""
+        summary = self.get_sentiment_summary(brand, hours=4)  # Last 4 hours
+        alerts = []
+        
+        # Sentiment drop alert
+        if summary['avg_sentiment'] < self.alert_thresholds['sentiment_drop']:
+            alerts.append(SentimentAlert(
+                alert_type='sentiment_drop',
+                severity='high',
+                message=f"Sentiment for {brand} dropped to {summary['avg_sentiment']:.2f}",
+                timestamp=datetime.now(),
+                brand=brand,
+                threshold_value=self.alert_thresholds['sentiment_drop'],
+                current_value=summary['avg_sentiment']
+            ))
+        
+        # Negative sentiment spike
+        if summary['negative_pct'] > (self.alert_thresholds['negative_spike'] * 100):
+            alerts.append(SentimentAlert(
+                alert_type='negative_spike',
+                severity='medium',
+                message=f"Negative sentiment for {brand} spiked to {summary['negative_pct']:.1f}%",
+                timestamp=datetime.now(),
+                brand=brand,
+                threshold_value=self.alert_thresholds['negative_spike'],
+                current_value=summary['negative_pct'] / 100
+            ))
+        
+        return alerts
+
+class MetricsAPIClient:
+    """Read-only client for api_server.py, mirroring the SentimentAnalysisPlatform query methods.
+    
+    Responses are cached per URL with their ETag so unchanged data comes back as a 304.
+    If the API can't be reached and a fallback platform is given, the same query runs
+    against it instead, and the API is skipped for retry_after seconds.
+    """
+    def __init__(self, base_url: str, fallback: Optional['SentimentAnalysisPlatform'] = None,
+                 timeout: float = 3.0, retry_after: float = 30.0):
+        self.base_url = base_url.rstrip('/')
+        self.fallback = fallback
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.last_error: Optional[Exception] = None
+        self._unavailable_until = 0.0
+        self._cache: Dict[str, Tuple[str, object]] = {}
+    
+    def _get(self, path: str, **params):
+        query = {key: value.isoformat() if isinstance(value, datetime) else value
+                 for key, value in params.items() if value is not None}
+        url = f"{self.base_url}{path}?{urllib.parse.urlencode(query)}"
+        request = urllib.request.Request(url, headers={'Accept-Encoding': 'gzip'})
+        cached = self._cache.get(url)
+        if cached:
+            request.add_header('If-None-Match', cached[0])
+        
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = response.read()
+                if response.headers.get('Content-Encoding') == 'gzip':
+                    body = gzip.decompress(body)
+                data = json.loads(body)
+                etag = response.headers.get('ETag')
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and cached:
+                return cached[1]
+            raise
+        
+        if etag:
+            self._cache[url] = (etag, data)
+        return data
+    
+    def _query(self, method: str, path: str, **params):
+        """GET path, or call the fallback platform's method with the same arguments"""
+        if self.fallback is not None and time.monotonic() < self._unavailable_until:
+            return getattr(self.fallback, method)(**params)
+        
+        try:
+            data = self._get(path, **params)
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            # URLError covers HTTP errors, OSError timeouts and resets, ValueError bad bodies
+            if self.fallback is None:
+                raise
+            self.last_error = e
+            self._unavailable_until = time.monotonic() + self.retry_after
+            return getattr(self.fallback, method)(**params)
+        
+        self.last_error = None
+        return data
+    
+    def get_sentiment_summary(self, brand: str, hours: int = 24) -> Dict:
+        return self._query('get_sentiment_summary', '/api/summary', brand=brand, hours=hours)
+    
+    def get_distribution_summary(self, brand: str, hours: int = 168,
+                                 start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict:
+        return self._query('get_distribution_summary', '/api/distribution',
+                           brand=brand, hours=hours, start=start, end=end)
+    
+    def get_sentiment_trend(self, brand: str, hours: int = 24) -> pd.DataFrame:
+        table = self._query('get_sentiment_trend', '/api/trend', brand=brand, hours=hours)
+        if isinstance(table, pd.DataFrame):
+            return table
+        return pd.DataFrame(table['data'], columns=table['columns'])
+    
+    def get_platform_breakdown(self, brand: str, hours: int = 24) -> pd.DataFrame:
+        table = self._query('get_platform_breakdown', '/api/platforms', brand=brand, hours=hours)
+        if isinstance(table, pd.DataFrame):
+            return table
+        return pd.DataFrame(table['data'], columns=table['columns'])
+    
+    def get_recent_mentions(self, brand: str, limit: int = 10) -> pd.DataFrame:
+        table = self._query('get_recent_mentions', '/api/recent', brand=brand, limit=limit)
+        if isinstance(table, pd.DataFrame):
+            return table
+        return pd.DataFrame(table['data'], columns=table['columns'])
+    
+    def get_tracked_brands(self) -> List[str]:
+        return self._query('get_tracked_brands', '/api/brands')
+    
+    def get_competitor_comparison(self, hours: int = 24) -> List[Dict]:
+        return self._query('get_competitor_comparison', '/api/comparison', hours=hours)
+    
+    def check_alerts(self, brand: str) -> List[SentimentAlert]:
+        alerts = self._query('check_alerts', '/api/alerts', brand=brand)
+        # Build new alerts rather than editing the dicts, which may be the ETag cache's copies
+        return [
+            alert if isinstance(alert, SentimentAlert)
+            else SentimentAlert(**{**alert, 'timestamp': datetime.fromisoformat(alert['timestamp'])})
+            for alert in alerts
+        ]
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Sentiment platform maintenance")
+    parser.add_argument('command', choices=['rebuild-sketches'])
+    parser.add_argument('--db-path', default='sentiment_data.db')
+    parser.add_argument('--brand', help="only this brand (default: every brand with mentions)")
+    args = parser.parse_args()
+    
+    platform = SentimentAnalysisPlatform(db_path=args.db_path)
+    if args.brand:
+        platform.rebuild_sketches(args.brand)
+        brands = [args.brand]
+    else:
+        brands = platform.rebuild_all_sketches()
+    print(f"Rebuilt sketches for {len(brands)} brand(s): {', '.join(brands)}")
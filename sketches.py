@@ -0,0 +1,160 @@
+"""
+Mergeable sketches for long-window sentiment aggregates
+HyperLogLog: distinct author counts
+KLL: sentiment score quantiles (median, p10, p90, ...)
+
+Both are built per brand and hour at ingest, serialized to bytes for SQLite,
+and merged at query time for any range of hours.
+"""
+
+import hashlib
+import math
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+
+
+def _hash64(values: Iterable[str]) -> np.ndarray:
+    """Stable 64-bit hashes (Python's hash() is salted per process, so unusable on disk)"""
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(str(v).encode('utf-8'), digest_size=8).digest(), 'little')
+         for v in values],
+        dtype=np.uint64
+    )
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Vectorised int.bit_length for uint64 arrays"""
+    values = values.copy()
+    lengths = np.zeros(len(values), dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = values >= np.uint64(1 << shift)
+        lengths[high] += shift
+        values[high] >>= np.uint64(shift)
+    lengths += (values > 0).astype(np.uint8)
+    return lengths
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter with 2**precision one-byte registers"""
+
+    def __init__(self, precision: int = 12, registers: Optional[np.ndarray] = None):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.registers = registers if registers is not None else np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values: Iterable[str]):
+        """Add values (anything with a str() form); None values are skipped"""
+        values = [v for v in values if v is not None]
+        if not values:
+            return
+        hashes = _hash64(values)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        remainder = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        # Rank = position of the leftmost 1-bit in the remaining 64 - p bits
+        rank = (64 - self.precision + 1 - _bit_length(remainder).astype(np.int16)).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: 'HyperLogLog'):
+        if other.precision != self.precision:
+            raise ValueError("cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction: linear counting
+            estimate = m * math.log(m / zeros)
+        return float(estimate)
+
+    def to_bytes(self) -> bytes:
+        return bytes([self.precision]) + self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'HyperLogLog':
+        return cls(precision=data[0], registers=np.frombuffer(data, dtype=np.uint8, offset=1).copy())
+
+
+class KLLSketch:
+    """KLL quantile sketch; rank error is roughly 1.7 / k with high probability.
+
+    Level h holds items of weight 2**h. When a level overflows it is sorted and
+    every other item (random offset) is promoted to the level above.
+    """
+
+    def __init__(self, k: int = 200, c: float = 2 / 3):
+        self.k = k
+        self.c = c
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.count = 0
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * self.c ** depth)))
+
+    def update(self, values: Sequence[float]):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.count += len(values)
+        self._compress()
+
+    def merge(self, other: 'KLLSketch'):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) >= self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # Keep one item back when odd so total weight is preserved exactly
+                keep, items = items[len(items) - len(items) % 2:], items[:len(items) - len(items) % 2]
+                promoted = items[np.random.randint(2)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        """Approximate values at the given quantiles in [0, 1]"""
+        if self.count == 0:
+            return [None] * len(qs)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(lvl), 2 ** h, dtype=np.float64)
+                                  for h, lvl in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        ranks = np.asarray(qs, dtype=np.float64) * cumulative[-1]
+        positions = np.minimum(np.searchsorted(cumulative, ranks, side='left'), len(items) - 1)
+        return items[positions].tolist()
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles([q])[0]
+
+    def to_bytes(self) -> bytes:
+        header = np.array([self.k, self.count, len(self.levels)] + [len(lvl) for lvl in self.levels],
+                          dtype=np.int64)
+        return header.tobytes() + np.concatenate(self.levels).astype(np.float64).tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'KLLSketch':
+        k, count, depth = np.frombuffer(data, dtype=np.int64, count=3).tolist()
+        sizes = np.frombuffer(data, dtype=np.int64, count=depth, offset=24)
+        items = np.frombuffer(data, dtype=np.float64, offset=24 + 8 * depth)
+        sketch = cls(k=k)
+        sketch.count = count
+        sketch.levels = [chunk.copy() for chunk in np.split(items, np.cumsum(sizes)[:-1])]
+        return sketch
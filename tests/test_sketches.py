@@ -0,0 +1,151 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from sentiment_platform import SentimentAnalysisPlatform
+from sketches import HyperLogLog, KLLSketch
+
+AUTHOR_ERROR = 0.05
+RANK_ERROR = 0.02
+QUANTILES = (0.1, 0.5, 0.9)
+HOUR_US = 3_600_000_000
+
+
+def rank_error(sorted_values: np.ndarray, estimate: float, q: float) -> float:
+    """Distance from q to the rank interval the estimate occupies (ties count as exact)"""
+    low = np.searchsorted(sorted_values, estimate, side='left') / len(sorted_values)
+    high = np.searchsorted(sorted_values, estimate, side='right') / len(sorted_values)
+    return max(0.0, low - q, q - high)
+
+
+@pytest.fixture(autouse=True)
+def seed():
+    np.random.seed(0)
+
+
+@pytest.mark.parametrize('n', [100, 10_000, 200_000])
+def test_hyperloglog_accuracy(n):
+    sketch = HyperLogLog()
+    sketch.update(f"user_{i}" for i in range(n))
+    # Repeats must not change the estimate
+    sketch.update(f"user_{i}" for i in range(0, n, 7))
+
+    assert abs(sketch.count() - n) / n < AUTHOR_ERROR
+
+
+def test_hyperloglog_merged_hours_equal_single_sketch():
+    authors = [f"user_{i}" for i in np.random.randint(0, 50_000, 100_000)]
+    single = HyperLogLog()
+    single.update(authors)
+
+    merged = HyperLogLog()
+    for hour in range(0, len(authors), 1_000):
+        part = HyperLogLog()
+        part.update(authors[hour:hour + 1_000])
+        merged.merge(HyperLogLog.from_bytes(part.to_bytes()))
+
+    np.testing.assert_array_equal(merged.registers, single.registers)
+    assert merged.count() == single.count()
+
+
+def test_kll_accuracy():
+    values = np.clip(np.random.normal(0.1, 0.5, 200_000), -1, 1)
+    sketch = KLLSketch()
+    sketch.update(values)
+
+    ordered = np.sort(values)
+    for q, estimate in zip(QUANTILES, sketch.quantiles(QUANTILES)):
+        assert rank_error(ordered, estimate, q) < RANK_ERROR
+
+
+def test_kll_merged_hours_match_single_sketch():
+    values = np.random.uniform(-1, 1, 720 * 300)
+    single = KLLSketch()
+    single.update(values)
+
+    merged = KLLSketch()
+    for hour in np.split(values, 720):
+        part = KLLSketch()
+        part.update(hour)
+        merged.merge(KLLSketch.from_bytes(part.to_bytes()))
+
+    ordered = np.sort(values)
+    assert merged.count == single.count == len(values)
+    for q, from_merged, from_single in zip(QUANTILES, merged.quantiles(QUANTILES), single.quantiles(QUANTILES)):
+        assert rank_error(ordered, from_merged, q) < RANK_ERROR
+        assert rank_error(ordered, from_single, q) < RANK_ERROR
+
+
+def test_empty_kll_has_no_quantiles():
+    assert KLLSketch().quantiles(QUANTILES) == [None, None, None]
+
+
+@pytest.fixture
+def platform(tmp_path):
+    platform = SentimentAnalysisPlatform(db_path=str(tmp_path / "sentiment.db"))
+    # Spread mentions over three days with many distinct authors
+    for _ in range(4):
+        batch = platform.collect_mentions("Apple", count=5_000)
+        batch.timestamp -= np.random.randint(0, 72, len(batch)) * HOUR_US
+        batch.author = np.array([f"user_{i}" for i in np.random.randint(0, 15_000, len(batch))], dtype=object)
+        platform.store_mentions("Apple", batch)
+    return platform
+
+
+def exact(db_path: str, start: str, end: str):
+    conn = sqlite3.connect(db_path)
+    authors = conn.execute(
+        'SELECT COUNT(DISTINCT author) FROM mentions WHERE brand = ? AND timestamp >= ? AND timestamp < ?',
+        ('Apple', start, end)
+    ).fetchone()[0]
+    scores = np.sort([row[0] for row in conn.execute(
+        'SELECT sentiment_score FROM mentions WHERE brand = ? AND timestamp >= ? AND timestamp < ?',
+        ('Apple', start, end)
+    )])
+    conn.close()
+    return authors, scores
+
+
+@pytest.mark.parametrize('hours', [6, 24, 72])
+def test_distribution_summary_matches_exact_answers(platform, hours):
+    summary = platform.get_distribution_summary("Apple", hours)
+    authors, scores = exact(platform.db_path, summary['window_start'], summary['window_end'])
+
+    assert summary['total_mentions'] == len(scores)
+    assert abs(summary['unique_authors'] - authors) / authors < AUTHOR_ERROR
+    for q, key in zip(QUANTILES, ('sentiment_p10', 'sentiment_median', 'sentiment_p90')):
+        assert rank_error(scores, summary[key], q) < RANK_ERROR
+
+
+def test_distribution_summary_explicit_range(platform):
+    end = datetime.now() - timedelta(hours=24)
+    summary = platform.get_distribution_summary("Apple", start=end - timedelta(hours=12), end=end)
+    authors, scores = exact(platform.db_path, summary['window_start'], summary['window_end'])
+
+    assert summary['total_mentions'] == len(scores) > 0
+    assert abs(summary['unique_authors'] - authors) / authors < AUTHOR_ERROR
+
+
+def test_distribution_summary_empty_window(platform):
+    summary = platform.get_distribution_summary("Unknown brand", 24)
+
+    assert summary['total_mentions'] == 0
+    assert summary['unique_authors'] == 0
+    assert summary['sentiment_median'] is None
+
+
+def test_legacy_database_is_backfilled(platform):
+    # A database from before the sketch table existed: mentions only
+    conn = sqlite3.connect(platform.db_path)
+    conn.execute('DROP TABLE mention_sketches')
+    conn.commit()
+    conn.close()
+
+    reopened = SentimentAnalysisPlatform(db_path=platform.db_path)
+    summary = reopened.get_distribution_summary("Apple", 72)
+
+    assert summary['total_mentions'] > 0
+    assert summary['unique_authors'] > 0
+    assert summary['sentiment_median'] is not None